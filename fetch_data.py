@@ -1,6 +1,12 @@
 import os
+import asyncio
 import logging
+import shutil
+import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
 
 # Config file has kaggle.json
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,6 +25,109 @@ logging.basicConfig(
     ]
 )
 
+# Kaggle REST endpoint for a single dataset file (the SDK's download target)
+KAGGLE_DOWNLOAD_URL = "https://www.kaggle.com/api/v1/datasets/download/{dataset}/{file_name}"
+
+# One pooled keep-alive connector shared by every download, so TCP+TLS
+# handshakes are amortised across files
+MAX_CONNECTIONS = 8
+
+# No cap on total download time (large files); only on stalls between reads
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_read=60)
+
+# Retries for connection errors and 5xx responses (exponential backoff)
+DOWNLOAD_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.3
+
+# Buffer size for streaming downloads and zip members to disk
+COPY_BUFFER_SIZE = 1 << 20
+
+
+def _member_path(target_dir, member_name):
+    """Resolves a zip member's destination, rejecting paths outside target_dir."""
+    root = os.path.realpath(target_dir)
+    dest = os.path.realpath(os.path.join(root, member_name))
+    if os.path.commonpath([root, dest]) != root:
+        raise ValueError(f"Refusing to extract '{member_name}' outside {target_dir}")
+    return dest
+
+
+def _extract_one(zip_path, info, dest):
+    """Extracts one member using its own ZipFile handle (handles are not thread-safe)."""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        with zip_ref.open(info) as src, open(dest, 'wb') as dst:
+            shutil.copyfileobj(src, dst, length=COPY_BUFFER_SIZE)
+
+
+def _extract_zip(zip_path, target_dir):
+    """Extracts every member of a zip archive into target_dir in parallel."""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        members = [info for info in zip_ref.infolist() if not info.is_dir()]
+
+    # Resolve destinations and create directories up front, in a single pass
+    destinations = [_member_path(target_dir, info.filename) for info in members]
+    for dest in destinations:
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+
+    if not members:
+        return
+
+    # zlib releases the GIL while inflating, so members decompress concurrently
+    workers = min(os.cpu_count() or 1, len(members))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(_extract_one, [zip_path] * len(members), members, destinations))
+
+
+async def _download_to(session, url, dest, auth):
+    """Streams a URL to dest, retrying transient failures with backoff."""
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        try:
+            # Per-request auth is dropped on the cross-origin redirect to the
+            # storage host; session-level auth would be re-sent there
+            async with session.get(url, auth=auth, timeout=DOWNLOAD_TIMEOUT) as resp:
+                resp.raise_for_status()
+                with open(dest, 'wb') as f:
+                    async for chunk in resp.content.iter_chunked(COPY_BUFFER_SIZE):
+                        f.write(chunk)
+            return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            client_error = isinstance(e, aiohttp.ClientResponseError) and e.status < 500
+            if client_error or attempt == DOWNLOAD_RETRIES:
+                raise
+            delay = RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            logging.warning(f"Download of {url} failed ({e}); retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+
+async def _afetch(session, auth, dataset, file_name, target_dir):
+    """Streams a single dataset file to disk and extracts it if it arrives zipped."""
+    logging.info(f"Downloading {file_name}...")
+    url = KAGGLE_DOWNLOAD_URL.format(dataset=dataset, file_name=file_name)
+
+    # Download into a self-cleaning scratch dir so the zip never needs removing
+    with tempfile.TemporaryDirectory(dir=target_dir) as scratch_dir:
+        download_path = os.path.join(scratch_dir, file_name)
+        await _download_to(session, url, download_path, auth)
+
+        # Handling ZIP files (Kaggle serves compressed files as zip archives)
+        if zipfile.is_zipfile(download_path):
+            logging.info(f"Extracting {file_name}...")
+            await asyncio.to_thread(_extract_zip, download_path, target_dir)
+            logging.info(f"Successfully extracted {file_name}")
+        else:
+            shutil.move(download_path, os.path.join(target_dir, file_name))
+            logging.info(f"Downloaded {file_name} (no extraction needed).")
+
+
+async def _download_all(username, key, dataset, file_names, target_dir):
+    """Downloads all files concurrently over one pooled HTTP client session."""
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, limit_per_host=MAX_CONNECTIONS)
+    auth = aiohttp.BasicAuth(username, key)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(
+            *(_afetch(session, auth, dataset, file_name, target_dir) for file_name in file_names)
+        )
+
 
 def download_youtube_data():
     try:
@@ -42,25 +151,19 @@ def download_youtube_data():
 
         files_to_download = ["GB_category_id.json", "GBvideos.csv"]
 
+        # Check if specific files exist in the dataset
+        pending_files = []
         for file_name in files_to_download:
-            # Check if specific file exists in the dataset
             if file_name not in available_filenames:
                 logging.warning(f"File '{file_name}' not found in dataset. Skipping...")
                 continue
+            pending_files.append(file_name)
 
-            logging.info(f"Downloading {file_name}...")
-            api.dataset_download_file(dataset, file_name, path=target_dir)
-            
-            # Handling ZIP files
-            zip_path = os.path.join(target_dir, f"{file_name}.zip")
-            if os.path.exists(zip_path):
-                logging.info(f"Extracting {zip_path}...")
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(target_dir)
-                os.remove(zip_path)
-                logging.info(f"Successfully extracted and cleaned {file_name}")
-            else:
-                logging.info(f"Downloaded {file_name} (no extraction needed).")
+        if pending_files:
+            # Reuse the credentials the SDK resolved in authenticate()
+            username = api.config_values['username']
+            key = api.config_values['key']
+            asyncio.run(_download_all(username, key, dataset, pending_files, target_dir))
 
         logging.info("Data fetching process completed successfully.")
 
@@ -0,0 +1,126 @@
+import json
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; fall back to the stdlib parser
+    orjson = None
+
+# Kaggle stores trending dates as yy.dd.mm
+TRENDING_DATE_FORMAT = "%y.%d.%m"
+
+# publish_time is ISO 8601 (e.g. 2017-11-13T17:13:01.000Z). Values matching
+# this pattern go through Arrow's ISO 8601 cast, which handles fractional
+# seconds and zone offsets; anything else becomes null.
+ISO8601_PATTERN = r"^\d{4}-\d{2}-\d{2}([T ]\d{2}(:\d{2}(:\d{2}(\.\d{1,9})?)?)?(Z|[+-]\d{2}(:?\d{2})?)?)?$"
+# A zone can only follow the time part (so a date's "-13" is not an offset)
+ISO8601_ZONE_PATTERN = r"[T ].*(Z|[+-]\d{2}(:?\d{2})?)$"
+PUBLISH_TIME_TYPE = pa.timestamp("ms", tz="UTC")
+
+# Bytes per streamed CSV block; each block becomes one Arrow record batch
+CSV_BLOCK_SIZE = 16 << 20
+
+# Arrow schema for the raw videos CSV, so columns convert without inference
+VIDEO_ARROW_TYPES = {
+    "video_id": pa.string(),
+    "trending_date": pa.timestamp("s"),
+    "title": pa.string(),
+    "channel_title": pa.string(),
+    "category_id": pa.string(),
+    "publish_time": pa.string(),  # Parsed by parse_publish_time, nulling bad values
+    "views": pa.int64(),
+    "likes": pa.int64(),
+    "dislikes": pa.int64(),
+    "comment_count": pa.int64(),
+}
+
+
+def read_json(path):
+    """Reads a JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path) as f:
+        return json.load(f)
+
+
+def _cast_or_null(values, target_type):
+    """Casts values to target_type, nulling any that fail to convert."""
+    try:
+        return pc.cast(values, target_type)
+    except pa.ArrowInvalid:
+        # Rare: a value fits the pattern but is not a real date (e.g. Feb 30)
+        converted = []
+        for value in values.to_pylist():
+            try:
+                converted.append(pa.scalar(value, pa.string()).cast(target_type).as_py())
+            except pa.ArrowInvalid:
+                converted.append(None)
+        return pa.array(converted, type=target_type)
+
+
+def parse_publish_time(data):
+    """Converts a string publish_time column (Table or RecordBatch) to UTC timestamps.
+
+    Mirrors pandas' to_datetime(errors="coerce"): offsets are converted to
+    UTC, fractional seconds are kept, date-only values become midnight, values
+    without a zone are taken as UTC, and anything unparseable becomes null.
+    """
+    index = data.schema.get_field_index("publish_time")
+    column = data.column(index)
+    if not pa.types.is_string(column.type):
+        return data  # Already typed (e.g. read back from Parquet)
+
+    valid = pc.match_substring_regex(column, ISO8601_PATTERN)
+    zoned = pc.match_substring_regex(column, ISO8601_ZONE_PATTERN)
+    null = pa.scalar(None, pa.string())
+
+    # Arrow only casts zoned strings to a tz-aware type and vice versa, so the
+    # two forms are converted separately and then merged
+    with_zone = _cast_or_null(pc.if_else(pc.and_(valid, zoned), column, null), PUBLISH_TIME_TYPE)
+    without_zone = _cast_or_null(
+        pc.if_else(pc.and_(valid, pc.invert(zoned)), column, null), pa.timestamp("ms")
+    ).cast(PUBLISH_TIME_TYPE)
+    parsed = pc.coalesce(with_zone, without_zone)
+
+    columns = list(data.columns)
+    columns[index] = parsed
+    schema = data.schema.set(index, pa.field("publish_time", PUBLISH_TIME_TYPE))
+    return type(data).from_arrays(columns, schema=schema)
+
+
+def open_videos_dataset(path):
+    """Opens raw CSV or processed Parquet videos as a lazily scanned Arrow dataset.
+
+    Scans stream record batches and apply filters before rows are
+    materialised, so callers can discard already-loaded data cheaply.
+    """
+    if path.endswith(".parquet"):
+        return ds.dataset(path, format="parquet")
+
+    csv_format = ds.CsvFileFormat(
+        read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        # Free-text fields may contain quoted line breaks
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types=VIDEO_ARROW_TYPES,
+            timestamp_parsers=[pacsv.ISO8601, TRENDING_DATE_FORMAT],
+            # Empty fields are NULL (as with pd.read_csv); literal "NA" stays text
+            strings_can_be_null=True,
+            null_values=[""],
+        ),
+    )
+    return ds.dataset(path, format=csv_format)
+
+
+def read_clean_videos(path):
+    """Reads the whole videos file into a cleaned DataFrame.
+
+    Uses the same Arrow parse/convert options as open_videos_dataset, so the
+    transform and load steps share one set of cleaning rules.
+    """
+    table = open_videos_dataset(path).to_table()
+    return parse_publish_time(table).to_pandas()
@@ -2,7 +2,9 @@ import os
 import json
 import logging
 from datetime import datetime
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
 
 from sqlalchemy import (
     create_engine,
@@ -13,12 +15,16 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     UniqueConstraint,
+    func,
+    select,
     text,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
 
+from io_utils import open_videos_dataset, parse_publish_time, read_json
+
 # ------------------------------------------------------------------------------
 # Config & Logging
 # ------------------------------------------------------------------------------
@@ -26,6 +32,69 @@ from sqlalchemy.exc import SQLAlchemyError, OperationalError
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 RAW_DATA_DIR = "data/raw"
+PROCESSED_DATA_DIR = "data/processed"
+
+# Output of transform_data.py; preferred over the raw CSV when present
+PROCESSED_VIDEOS_FILE = "GB_videos_cleaned.parquet"
+
+# Max rows per scanned batch; bounds peak memory to a single batch
+CHUNK_SIZE = 100_000
+
+VIDEO_COLUMNS = [
+    "video_id", "trending_date", "title", "channel_title",
+    "category_id", "publish_time", "views", "likes",
+    "dislikes", "comment_count"
+]
+
+# Bulk load path: COPY new rows into a transaction-scoped staging table, then
+# merge them into 'videos' with a single set-based upsert.
+_VIDEO_COLUMN_LIST = ", ".join(VIDEO_COLUMNS)
+
+CREATE_VIDEOS_STAGE_SQL = f"""
+    CREATE TEMP TABLE videos_stage ON COMMIT DROP AS
+    SELECT {_VIDEO_COLUMN_LIST} FROM videos WITH NO DATA
+"""
+
+COPY_VIDEOS_STAGE_SQL = f"COPY videos_stage ({_VIDEO_COLUMN_LIST}) FROM STDIN WITH (FORMAT csv)"
+
+# Rows whose category_id has no match in 'categories' would violate the FK
+COUNT_ORPHAN_STAGE_SQL = """
+    SELECT count(*) FROM videos_stage s
+    WHERE NOT EXISTS (SELECT 1 FROM categories c WHERE c.id = s.category_id)
+"""
+
+# Referential integrity is enforced in SQL: only rows with a known category
+# are merged. DISTINCT ON guards against duplicate (video_id, trending_date)
+# rows in the source, which ON CONFLICT DO UPDATE cannot touch twice; of
+# each duplicate set the row with the most views wins (then likes, comment
+# count and title as tie-breakers), so re-runs store the same counts.
+UPSERT_FROM_STAGE_SQL = f"""
+    WITH upserted AS (
+        INSERT INTO videos ({_VIDEO_COLUMN_LIST})
+        SELECT DISTINCT ON (video_id, trending_date) {_VIDEO_COLUMN_LIST}
+        FROM videos_stage s
+        WHERE EXISTS (SELECT 1 FROM categories c WHERE c.id = s.category_id)
+        ORDER BY video_id, trending_date,
+                 views DESC NULLS LAST, likes DESC NULLS LAST,
+                 comment_count DESC NULLS LAST, title
+        ON CONFLICT (video_id, trending_date) DO UPDATE SET
+            views = EXCLUDED.views,
+            likes = EXCLUDED.likes,
+            dislikes = EXCLUDED.dislikes,
+            comment_count = EXCLUDED.comment_count,
+            title = EXCLUDED.title
+        RETURNING trending_date
+    )
+    SELECT count(*), max(trending_date) FROM upserted
+"""
+
+# BRIN suits 'videos': rows arrive in trending_date order, so block ranges
+# summarise tightly at a fraction of a B-tree's size. Applied as raw DDL so
+# it also reaches databases whose tables predate the index.
+VIDEOS_DATE_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS ix_videos_trending_date_brin
+    ON videos USING BRIN (trending_date)
+"""
 
 # Enhanced Logging: Outputs to both Console and a dedicated Log File
 logging.basicConfig(
@@ -69,6 +138,12 @@ class YouTubeVideo(Base):
 
     category_rel = relationship("Category", back_populates="videos")
 
+class IngestState(Base):
+    """High-watermark per loaded table, so incremental runs skip a max() scan."""
+    __tablename__ = "ingest_state"
+    table_name = Column(String, primary_key=True)
+    last_trending_date = Column(DateTime, nullable=False)
+
 # ------------------------------------------------------------------------------
 # Ingestion Logic with Exception Handling
 # ------------------------------------------------------------------------------
@@ -78,15 +153,15 @@ def load_categories(session):
         json_path = os.path.join(RAW_DATA_DIR, "GB_category_id.json")
         logger.info(f"Opening category file: {json_path}")
         
-        with open(json_path) as f:
-            raw = json.load(f)
+        raw = read_json(json_path)
 
         records = [
             {"id": item["id"], "category_title": item["snippet"]["title"]}
             for item in raw["items"]
         ]
 
-        stmt = insert(Category).values(records)
+        # Core insert against the Table skips ORM mapper/event overhead
+        stmt = insert(Category.__table__).values(records)
         stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
         session.execute(stmt)
         logger.info(f"Successfully Inserted {len(records)} categories.")
@@ -101,70 +176,125 @@ def load_categories(session):
         logger.error(f"Database error during category load: {e}")
         raise
 
-def load_videos(session):
-    try:
-        csv_path = os.path.join(RAW_DATA_DIR, "GBvideos.csv")
-        if not os.path.exists(csv_path):
-            raise FileNotFoundError(f"Missing CSV: {csv_path}")
+def _copy_to_stage(cursor, batch):
+    """Streams an Arrow record batch into the videos staging table via COPY."""
+    sink = pa.BufferOutputStream()
+    pacsv.write_csv(batch, sink, write_options=pacsv.WriteOptions(include_header=False))
+    cursor.copy_expert(COPY_VIDEOS_STAGE_SQL, pa.BufferReader(sink.getvalue()))
+
+def _iter_new_video_batches(last_date):
+    """Yields batches newer than last_date from the processed Parquet file, or the raw CSV if that is newer.
 
-        logger.info("Reading video CSV...")
-        df = pd.read_csv(csv_path)
+    The date filter is pushed into the Arrow scan, so already-ingested rows
+    are dropped (or whole Parquet row groups skipped) before reaching Python.
+    """
+    parquet_path = os.path.join(PROCESSED_DATA_DIR, PROCESSED_VIDEOS_FILE)
+    csv_path = os.path.join(RAW_DATA_DIR, "GBvideos.csv")
+    parquet_exists = os.path.exists(parquet_path)
+    csv_exists = os.path.exists(csv_path)
 
-        # Pre-processing
-        df["category_id"] = df["category_id"].astype(str)
-        df["trending_date"] = pd.to_datetime(df["trending_date"], format="%y.%d.%m")
-        df["publish_time"] = pd.to_datetime(df["publish_time"], errors="coerce")
+    if parquet_exists and (not csv_exists or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+        source_path = parquet_path
+    elif csv_exists:
+        if parquet_exists:
+            # Raw data was re-fetched without re-running transform_data.py
+            logger.warning(f"{parquet_path} is older than {csv_path}; loading from the raw CSV instead.")
+        source_path = csv_path
+    else:
+        raise FileNotFoundError(f"Missing CSV: {csv_path}")
 
-        # Incremental Load Logic
-        last_date = session.execute(text("SELECT max(trending_date) FROM videos")).scalar()
+    logger.info(f"Scanning videos from {source_path}...")
+    dataset = open_videos_dataset(source_path)
+
+    row_filter = None
+    if last_date:
+        date_type = dataset.schema.field("trending_date").type
+        row_filter = ds.field("trending_date") > pa.scalar(last_date).cast(date_type)
+
+    for batch in dataset.to_batches(columns=VIDEO_COLUMNS, filter=row_filter, batch_size=CHUNK_SIZE):
+        if batch.num_rows:
+            yield parse_publish_time(batch)
+
+def _save_watermark(session, last_date):
+    """Records the latest ingested trending_date; never moves it backwards."""
+    state = IngestState.__table__
+    stmt = insert(state).values(
+        table_name=YouTubeVideo.__tablename__, last_trending_date=last_date
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["table_name"],
+        set_={
+            "last_trending_date": func.greatest(
+                state.c.last_trending_date, stmt.excluded.last_trending_date
+            )
+        }
+    )
+    session.execute(stmt)
+
+def load_videos(session):
+    try:
+        # Incremental Load Logic (O(1) primary-key lookup of the watermark)
+        last_date = session.execute(
+            select(IngestState.last_trending_date)
+            .where(IngestState.table_name == YouTubeVideo.__tablename__)
+        ).scalar()
+        if last_date is None:
+            # No watermark yet (first run, or a database predating ingest_state)
+            last_date = session.execute(text("SELECT max(trending_date) FROM videos")).scalar()
+            if last_date:
+                _save_watermark(session, last_date)
         if last_date:
-            df = df[df["trending_date"] > last_date]
             logger.info(f"Filtering for new data since {last_date}")
 
-        if df.empty:
+        # Staging table lives on the session's connection and drops on commit
+        session.execute(text(CREATE_VIDEOS_STAGE_SQL))
+        cursor = session.connection().connection.cursor()
+
+        staged_count = 0
+
+        try:
+            for batch in _iter_new_video_batches(last_date):
+                _copy_to_stage(cursor, batch)
+                staged_count += batch.num_rows
+        finally:
+            cursor.close()
+
+        if staged_count == 0:
             logger.info("No new records to ingest.")
             return
 
-        # Referential Integrity Check (Filter out IDs not in 'categories' table)
-        valid_categories = {c[0] for c in session.execute(text("SELECT id FROM categories"))}
-        df_filtered = df[df["category_id"].isin(valid_categories)].copy()
-        
-        dropped_count = len(df) - len(df_filtered)
+        # Referential Integrity Check (rows with IDs not in 'categories' are skipped)
+        dropped_count = session.execute(text(COUNT_ORPHAN_STAGE_SQL)).scalar()
         if dropped_count > 0:
             logger.warning(f"Dropped {dropped_count} rows due to missing Foreign Key (Category ID).")
 
-        records = df_filtered[[
-            "video_id", "trending_date", "title", "channel_title",
-            "category_id", "publish_time", "views", "likes",
-            "dislikes", "comment_count"
-        ]].to_dict(orient="records")
-
-        # Bulk Upsert
-        stmt = insert(YouTubeVideo).values(records)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["video_id", "trending_date"],
-            set_={
-                "views": stmt.excluded.views,
-                "likes": stmt.excluded.likes,
-                "dislikes": stmt.excluded.dislikes,
-                "comment_count": stmt.excluded.comment_count,
-                "title": stmt.excluded.title # In case the title changed
-            }
-        )
-        session.execute(stmt)
-        logger.info(f"Successfully ingested {len(records)} video records.")
+        # Set-based Upsert from staging
+        ingested_count, new_last_date = session.execute(text(UPSERT_FROM_STAGE_SQL)).one()
+        if new_last_date is not None:
+            _save_watermark(session, new_last_date)
+        logger.info(f"Successfully ingested {ingested_count} video records.")
 
     except Exception as e:
         logger.error(f"Error during video ingestion: {e}")
         raise
 
 def run_pipeline():
-    engine = create_engine(DATABASE_URL)
+    # values_plus_batch routes executemany through psycopg2's fast helpers:
+    # INSERTs become multi-row VALUES pages, UPDATE/DELETE use execute_batch.
+    engine = create_engine(
+        DATABASE_URL,
+        executemany_mode="values_plus_batch",
+        insertmanyvalues_page_size=1000,
+        executemany_batch_page_size=500,
+        pool_pre_ping=True,
+    )
     SessionLocal = sessionmaker(bind=engine)
     
     try:
         logger.info("Verifying database connection and schema...")
         Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text(VIDEOS_DATE_INDEX_DDL))
         
         with SessionLocal.begin() as session:
             load_categories(session)
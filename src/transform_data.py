@@ -1,8 +1,10 @@
 import pandas as pd
-import json
+import numpy as np
 import os
 import logging
 
+from io_utils import read_clean_videos, read_json
+
 # Logging Configuration
 logging.basicConfig(
     level=logging.INFO,
@@ -31,16 +33,24 @@ class YouTubeTransformer:
         
         try:
             if ext == '.json':
-                with open(file_path, 'r') as f:
-                    return json.load(f)
+                return read_json(file_path)
             elif ext == '.csv':
-                return pd.read_csv(file_path)
+                return read_clean_videos(file_path)
             else:
                 raise ValueError(f"Unsupported file type: {ext}")
         except Exception as e:
             logging.error(f"Error parsing {filename}: {e}")
             raise
 
+    def map_categories(self, df, category_mapping):
+        """Maps category ids to titles through categorical codes (a vectorised gather)."""
+        ids = pd.Categorical(df['category_id'], categories=list(category_mapping.keys()))
+
+        # Unknown ids get code -1, which picks the trailing None (-> unmapped)
+        titles = np.array(list(category_mapping.values()) + [None], dtype=object)
+        df['category_title'] = titles[ids.codes]
+        return df
+
     def transform(self):
         try:
             logging.info("Starting transformation process...")
@@ -57,9 +67,8 @@ class YouTubeTransformer:
             df = self.parse_file("GBvideos.csv")
             logging.info(f"Loaded {len(df)} rows from CSV.")
 
-            # Data Cleaning & Mapping
-            df['category_id'] = df['category_id'].astype(str)
-            df['category_title'] = df['category_id'].map(category_mapping)
+            # Category Mapping (ids and dates are cleaned on read)
+            df = self.map_categories(df, category_mapping)
 
             # Validation check
             missing = df['category_title'].isnull().sum()
@@ -68,14 +77,10 @@ class YouTubeTransformer:
             else:
                 logging.info("All categories mapped successfully.")
 
-            # Formatting Dates
-            df['trending_date'] = pd.to_datetime(df['trending_date'], format='%y.%d.%m')
-            df['publish_time'] = pd.to_datetime(df['publish_time'])
-            logging.info("Date columns formatted successfully.")
-
             # Save Result
-            output_file = os.path.join(self.processed_path, "GB_videos_cleaned.csv")
-            df.to_csv(output_file, index=False)
+            # Parquet keeps column types and is far smaller/faster to reload than CSV
+            output_file = os.path.join(self.processed_path, "GB_videos_cleaned.parquet")
+            df.to_parquet(output_file, engine="pyarrow", compression="zstd", index=False)
             logging.info(f"Transformation complete! File saved to: {output_file}")
 
         except FileNotFoundError as e: